@@ -1,3 +1,9 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is only required by the batch mode
+    np = None
+
+
 INSTRUCTIONS: dict = {
     0x00: "NOP",
     0x10: "BIPUSH",
@@ -291,6 +297,538 @@ def addressedRun(bytecode: str, constantPool: str = "") -> list:
     return stack
 
 
+class LaneDivergence(Exception):
+    """Raised when the lanes of a batch group disagree on a control flow decision.
+
+    Args:
+        keys (np.ndarray): Per-lane values on which the group has to be split.
+    """
+
+    def __init__(self, keys):
+        super().__init__("Lanes diverged.")
+        self.keys = keys
+
+
+def laneCondition(condition) -> bool:
+    """Returns the outcome of a condition shared by every lane, or signals a divergence.
+
+    Args:
+        condition (np.ndarray): Boolean outcome of the condition for each lane.
+
+    Raises:
+        LaneDivergence: If the condition holds for some lanes only.
+
+    Returns:
+        bool: The common outcome.
+    """
+
+    if condition.all():
+        return True
+    if not condition.any():
+        return False
+    raise LaneDivergence(condition)
+
+
+def laneSigned2c(values):
+    """Convert a byte to a signed 2's complement number on every lane (see signed2c).
+
+    Args:
+        values (np.ndarray): One byte per lane.
+
+    Returns:
+        np.ndarray: Signed 2's complement number of each lane.
+    """
+
+    return np.where(values & 0x80, -((values ^ 0xFF) + 1), values)
+
+
+def wrapInt64(value: int) -> int:
+    """Wraps an integer to a signed 64-bit integer, as the stack values of the batch lanes do.
+
+    Args:
+        value (int): Input integer.
+
+    Returns:
+        int: The integer wrapped to 64 bits.
+    """
+
+    return ((value + 2**63) % 2**64) - 2**63
+
+
+def sharedColumns(rows) -> list:
+    """For each column of a per-lane array, finds the value shared by every lane.
+
+    Args:
+        rows (np.ndarray): One row per lane.
+
+    Returns:
+        list: The shared value of each column, or None where the lanes disagree.
+    """
+
+    shared: list = (rows == rows[0]).all(axis=0).tolist()
+    return [value if same else None for value, same in zip(rows[0].tolist(), shared)]
+
+
+def makeGroup(lanes, stack: list, pointer: int, address: int, bytecode, constantPool, defSections) -> dict:
+    """Builds a group of lanes running in lockstep.
+
+    The values shared by every lane of the group are cached as plain lists, so that
+    reading an instruction or a constant does not cost a NumPy call.
+
+    Args:
+        lanes (np.ndarray): Indexes of the variants in the group.
+        stack (list): Batch stack, one array of lane values per slot.
+        pointer (int): Position of the pointer in the bytecode.
+        address (int): Starting address of the bytecode.
+        bytecode (np.ndarray): Bytecode of each lane.
+        constantPool (np.ndarray): Constant pool of each lane.
+        defSections (np.ndarray): For each lane and position, whether it is in a method definition section.
+
+    Returns:
+        dict: The group.
+    """
+
+    return {
+        "lanes": lanes,
+        "stack": stack,
+        "pointer": pointer,
+        "address": address,
+        "bytecode": bytecode,
+        "constantPool": constantPool,
+        "defSections": defSections,
+        "code": sharedColumns(bytecode),
+        "pool": sharedColumns(constantPool) if constantPool.shape[1] else [],
+        "defSection": sharedColumns(defSections),
+        "error": None,
+    }
+
+
+def splitGroup(group: dict, keys) -> list:
+    """Splits a group into one group per distinct key.
+
+    Args:
+        group (dict): Lanes running in lockstep.
+        keys (np.ndarray): Per-lane values on which the lanes disagreed.
+
+    Returns:
+        list: The new groups.
+    """
+
+    groups: list = []
+    for key in np.unique(keys):
+        mask = keys == key
+        groups.append(makeGroup(
+            group["lanes"][mask],
+            [slot[mask] for slot in group["stack"]],
+            group["pointer"],
+            group["address"],
+            group["bytecode"][mask],
+            group["constantPool"][mask],
+            group["defSections"][mask],
+        ))
+    return groups
+
+
+def mergeGroups(groups: list) -> dict:
+    """Merges groups sharing the same pointer and stack depth into a single group.
+
+    Args:
+        groups (list): Groups to merge.
+
+    Returns:
+        dict: The merged group.
+    """
+
+    return makeGroup(
+        np.concatenate([group["lanes"] for group in groups]),
+        [np.concatenate(slots) for slots in zip(*(group["stack"] for group in groups))],
+        groups[0]["pointer"],
+        groups[0]["address"],
+        np.concatenate([group["bytecode"] for group in groups]),
+        np.concatenate([group["constantPool"] for group in groups]),
+        np.concatenate([group["defSections"] for group in groups]),
+    )
+
+
+def groupByte(group: dict, pos: int) -> int:
+    """Reads a byte of the bytecode that must be the same on every lane of a group.
+
+    Args:
+        group (dict): Lanes running in lockstep.
+        pos (int): Position of the byte in the bytecode.
+
+    Raises:
+        LaneDivergence: If the lanes do not all hold the same byte.
+
+    Returns:
+        int: The byte.
+    """
+
+    if (byte := group["code"][pos]) is None:
+        raise LaneDivergence(group["bytecode"][:, pos])
+    return byte
+
+
+def batchFrameAddress(stack: list, varPos: int) -> int:
+    """Finds the position of a local variable in a batch stack (see ILOAD in executeInstruction).
+
+    Args:
+        stack (list): Batch stack, one array of lane values per slot.
+        varPos (int): Index of the local variable.
+
+    Returns:
+        int: Position of the variable in the stack.
+    """
+
+    varAddr: int = len(stack) - 1
+    while laneCondition(stack[varAddr] != 0x2_000_000):
+        varAddr -= 1
+    varAddr -= 1
+    while laneCondition((stack[varAddr] & 0x2_000_000) == 0):
+        varAddr -= 1
+    return varAddr + varPos
+
+
+def executeBatchInstruction(group: dict, constantPoolAddress: int) -> int:
+    """Takes an instruction and executes it on every lane of a group.
+
+    Every control flow decision is taken before the stack is modified, so that a
+    LaneDivergence leaves the group untouched and the instruction can be replayed
+    on each of the resulting groups.
+
+    Args:
+        group (dict): Lanes running in lockstep.
+        constantPoolAddress (int): Starting address of the constant pool.
+
+    Raises:
+        LaneDivergence: If the lanes of the group take different paths.
+
+    Returns:
+        int: New position of the pointer.
+    """
+
+    stack: list = group["stack"]
+    pointer: int = group["pointer"]
+    lanes: int = len(group["lanes"])
+
+    opcode: int = groupByte(group, pointer)
+    if opcode not in INSTRUCTIONS:
+        return pointer + 1
+
+    match INSTRUCTIONS[opcode]:
+        case "NOP":
+            return pointer + 1
+
+        case "BIPUSH":
+            if (operand := group["code"][pointer + 1]) is None:
+                stack.append(laneSigned2c(group["bytecode"][:, pointer + 1]))
+            else:
+                stack.append(np.full(lanes, signed2c(operand), dtype=np.int64))
+            return pointer + 2
+
+        case "LDCW":
+            index: int = groupByte(group, pointer + 1) << 8 | groupByte(group, pointer + 2)
+            if (constant := group["pool"][index]) is None:
+                stack.append(laneSigned2c(group["constantPool"][:, index]))
+            else:
+                stack.append(np.full(lanes, signed2c(constant), dtype=np.int64))
+            return pointer + 3
+
+        case "ILOAD":
+            varAddr: int = batchFrameAddress(stack, groupByte(group, pointer + 1))
+            stack.append(stack[varAddr])
+            return pointer + 2
+
+        case "ISTORE":
+            varAddr: int = batchFrameAddress(stack, groupByte(group, pointer + 1))
+            stack[varAddr] = stack.pop()
+            return pointer + 2
+
+        case "POP":
+            stack.pop()
+            return pointer + 1
+
+        case "DUP":
+            stack.append(stack[-1])
+            return pointer + 1
+
+        case "SWAP":
+            stack[-1], stack[-2] = stack[-2], stack[-1]
+            return pointer + 1
+
+        case "IADD":
+            TOS = stack.pop()
+            stack[-1] = stack[-1] + TOS
+            return pointer + 1
+
+        case "ISUB":
+            TOS = stack.pop()
+            stack[-1] = stack[-1] - TOS
+            return pointer + 1
+
+        case "IAND":
+            TOS = stack.pop()
+            stack[-1] = stack[-1] & TOS
+            return pointer + 1
+
+        case "IOR":
+            TOS = stack.pop()
+            stack[-1] = stack[-1] | TOS
+            return pointer + 1
+
+        case "IINC":
+            varAddr: int = batchFrameAddress(stack, groupByte(group, pointer + 1))
+            stack[varAddr] = stack[varAddr] + laneSigned2c(group["bytecode"][:, pointer + 2])
+            return pointer + 3
+
+        case "IFEQ" | "IFLT" | "IFICMPEQ" as instruction:
+            match instruction:
+                case "IFEQ":
+                    jump: bool = laneCondition(stack[-1] == 0)
+                    del stack[-1]
+                case "IFLT":
+                    jump: bool = laneCondition(stack[-1] < 0)
+                    del stack[-1]
+                case "IFICMPEQ":
+                    jump: bool = laneCondition(stack[-1] == stack[-2])
+                    del stack[-2:]
+            if jump:
+                return pointer + signed2c(groupByte(group, pointer + 1), groupByte(group, pointer + 2))
+            return pointer + 3
+
+        case "GOTO":
+            return pointer + signed2c(groupByte(group, pointer + 1), groupByte(group, pointer + 2))
+
+        case "IRETURN":
+            markerAddr: int = len(stack) - 2
+            while laneCondition(stack[markerAddr] != 0x2_000_000):
+                markerAddr -= 1
+            methodAddr: int = (markerAddr - 1) | 0x2_000_000
+            returnAddrs = stack[markerAddr - 1]
+            if not (returnAddrs == returnAddrs[0]).all():
+                raise LaneDivergence(returnAddrs)
+            returnPointer: int = int(returnAddrs[0]) - group["address"]
+            envAddr: int = markerAddr - 2
+            while laneCondition(stack[envAddr] != methodAddr):
+                envAddr -= 1
+            returnValue = stack[-1]
+            del stack[envAddr + 1:]
+            stack[envAddr] = returnValue
+            return returnPointer
+
+        case "INVOKEVIRTUAL":
+            index: int = groupByte(group, pointer + 1) << 8 | groupByte(group, pointer + 2)
+            if (methodAddr := group["pool"][index - constantPoolAddress]) is None:
+                raise LaneDivergence(group["constantPool"][:, index - constantPoolAddress])
+            methodPointer = methodAddr - group["address"]
+            varAmount: int = groupByte(group, methodPointer + 2) << 8 | groupByte(group, methodPointer + 3)
+            argsAmount: int = groupByte(group, methodPointer) << 8 | groupByte(group, methodPointer + 1)
+            envDefinition: int = 0x2_000_000 + len(stack) + varAmount
+            stack[-argsAmount] = np.full(lanes, envDefinition, dtype=np.int64)
+            for _ in range(varAmount):
+                stack.append(np.zeros(lanes, dtype=np.int64))
+            stack.append(np.full(lanes, group["address"] + pointer + 3, dtype=np.int64))
+            stack.append(np.full(lanes, 0x2_000_000, dtype=np.int64))
+            return methodPointer + 4
+
+        case "WIDE":
+            raise NotImplementedError("WIDE instruction is not supported yet.")
+
+
+def stepBatchGroup(group: dict, constantPoolAddress: int) -> list:
+    """Executes one instruction on a group, splitting it as many times as its lanes diverge.
+
+    Lanes only share a group while their control flow and stack layout agree, so an
+    error raised by the instruction is raised by every lane of the group: it is
+    stored in the group instead of interrupting the other groups.
+
+    Args:
+        group (dict): Lanes running in lockstep.
+        constantPoolAddress (int): Starting address of the constant pool.
+
+    Returns:
+        list: The groups after the instruction.
+    """
+
+    try:
+        group["pointer"] = executeBatchInstruction(group, constantPoolAddress)
+    except LaneDivergence as divergence:
+        return [
+            stepped
+            for subGroup in splitGroup(group, divergence.keys)
+            for stepped in stepBatchGroup(subGroup, constantPoolAddress)
+        ]
+    except Exception as error:
+        group["error"] = error
+    return [group]
+
+
+def runBatchGroup(group: dict, limit: int, constantPoolAddress: int) -> list:
+    """Runs a group until it ends, reaches the pointer limit, diverges or fails.
+
+    Args:
+        group (dict): Lanes running in lockstep.
+        limit (int): Pointer at which the group hands over to the other groups.
+        constantPoolAddress (int): Starting address of the constant pool.
+
+    Returns:
+        list: The groups after the execution.
+    """
+
+    length: int = len(group["code"])
+    while True:
+        groups: list = stepBatchGroup(group, constantPoolAddress)
+        pointer: int = group["pointer"]
+        if len(groups) > 1 or group["error"] or pointer >= limit or pointer >= length or group["defSection"][pointer] is not False:
+            return groups
+
+
+def runLane(group: dict, limit: int, constantPoolAddress: int) -> None:
+    """Runs a group of a single lane with the scalar interpreter, until it ends, reaches the pointer limit or fails.
+
+    The results of IADD, ISUB and IINC are wrapped to 64 bits, so that the lane gives
+    the same result as in a group of several lanes.
+
+    Args:
+        group (dict): Group holding a single lane.
+        limit (int): Pointer at which the group hands over to the other groups.
+        constantPoolAddress (int): Starting address of the constant pool.
+    """
+
+    stack: list = [int(slot[0]) for slot in group["stack"]]
+    bytecodeData: dict = {"address": group["address"], "data": group["code"]}
+    constantPoolData: dict = {"address": constantPoolAddress, "data": group["pool"]}
+    pointer: int = group["pointer"]
+    while True:
+        opcode: int = bytecodeData["data"][pointer]
+        if opcode not in INSTRUCTIONS:
+            pointer += 1
+        else:
+            try:
+                pointer = executeInstruction(stack, pointer, bytecodeData, constantPoolData)
+            except Exception as error:
+                group["error"] = error
+                return
+            match INSTRUCTIONS[opcode]:
+                case "IADD" | "ISUB":
+                    stack[-1] = wrapInt64(stack[-1])
+                case "IINC":
+                    stack[:] = [wrapInt64(value) for value in stack]
+        if pointer >= limit or pointer >= len(bytecodeData["data"]) or group["defSection"][pointer]:
+            break
+
+    group["pointer"] = pointer
+    group["stack"] = [np.array([value], dtype=np.int64) for value in stack]
+
+
+def batchRun(bytecode: str, variants: list, constantPool: str = "") -> list:
+    """Takes an IJVM bytecode in addressed format, runs it once per input variant and returns the stack states.
+
+    The bytecode is parsed once and every variant is a lane of a NumPy array. Lanes
+    run in lockstep and are split into groups as soon as their control flow diverges.
+    The group with the lowest pointer always runs first, so that groups reaching the
+    same pointer with the same stack depth are merged back together. Groups of a
+    single lane are run by the scalar interpreter.
+
+    Unlike run(), stack values are 64-bit integers: IADD, ISUB and IINC silently wrap on overflow.
+    An error raised by a variant does not stop the other ones, it is returned in place of its stack.
+
+    Args:
+        bytecode (str): IJVM bytecode.
+        variants (list): Input variants, each one a dict that may contain a "bytecode" and a "constantPool" dict
+            mapping an address to the value that replaces the original one (e.g. a BIPUSH operand or an LDCW constant).
+        constantPool (str, optional): Constant pool of the IJVM bytecode. Defaults to "".
+
+    Raises:
+        ValueError: If a variant patches an address outside of the bytecode or of the constant pool.
+
+    Returns:
+        list: State of the stack after the execution of the bytecode, or the raised exception, for each variant.
+    """
+
+    if np is None:
+        raise ImportError("Batch execution requires NumPy.")
+
+    bytecodeData: dict = extractData(bytecode)
+    constantPoolData: dict = extractData(constantPool)
+    bytecodeAddress: int = bytecodeData["address"] or 0
+    constantPoolAddress: int = constantPoolData["address"] or 0
+    length: int = len(bytecodeData["data"])
+
+    laneBytecode = np.tile(np.array(bytecodeData["data"], dtype=np.int64), (len(variants), 1))
+    laneConstantPool = np.tile(np.array(constantPoolData["data"], dtype=np.int64), (len(variants), 1))
+    for lane, variant in enumerate(variants):
+        for addr, value in variant.get("bytecode", {}).items():
+            if not 0 <= addr - bytecodeAddress < length:
+                raise ValueError(f"Address {hex(addr)} is outside of the bytecode.")
+            laneBytecode[lane, addr - bytecodeAddress] = value
+        for addr, value in variant.get("constantPool", {}).items():
+            if not 0 <= addr - constantPoolAddress < laneConstantPool.shape[1]:
+                raise ValueError(f"Address {hex(addr)} is outside of the constant pool.")
+            laneConstantPool[lane, addr - constantPoolAddress] = value
+
+    # Method definition sections of every lane, computed once for the whole run
+    laneDefSections = np.zeros(laneBytecode.shape, dtype=bool)
+    laneIndexes = np.arange(len(variants))
+    for defAddrs in (laneConstantPool - bytecodeAddress).T:
+        for offset in range(4):
+            defPointers = defAddrs + offset
+            inBytecode = (defAddrs > 0) & (defPointers < length)
+            laneDefSections[laneIndexes[inBytecode], defPointers[inBytecode]] = True
+
+    groups: list = [] if not variants else [makeGroup(
+        laneIndexes,
+        [np.zeros(len(variants), dtype=np.int64)],
+        0,
+        bytecodeAddress,
+        laneBytecode,
+        laneConstantPool,
+        laneDefSections,
+    )]
+    outputStacks: list = [None] * len(variants)
+
+    while groups:
+        pointer: int = min(group["pointer"] for group in groups)
+        readyGroups: dict = {}
+        pendingGroups: list = []
+        for group in groups:
+            if group["pointer"] != pointer:
+                pendingGroups.append(group)
+                continue
+            if pointer < length and group["defSection"][pointer] is None:
+                subGroups: list = splitGroup(group, group["defSections"][:, pointer])
+            else:
+                subGroups: list = [group]
+            for subGroup in subGroups:
+                if pointer >= length or subGroup["defSection"][pointer]:
+                    for i, lane in enumerate(subGroup["lanes"]):
+                        outputStacks[lane] = [int(slot[i]) for slot in subGroup["stack"]]
+                else:
+                    readyGroups.setdefault(len(subGroup["stack"]), []).append(subGroup)
+
+        groups = pendingGroups
+        readyGroups: list = [mergeGroups(ready) if len(ready) > 1 else ready[0] for ready in readyGroups.values()]
+        if not readyGroups:
+            continue
+        group: dict = readyGroups.pop()
+        groups.extend(readyGroups)
+        limit: int = min((pending["pointer"] for pending in groups), default=length)
+
+        if len(group["lanes"]) == 1:
+            runLane(group, limit, constantPoolAddress)
+            ranGroups: list = [group]
+        else:
+            ranGroups: list = runBatchGroup(group, limit, constantPoolAddress)
+        for ranGroup in ranGroups:
+            if ranGroup["error"] is None:
+                groups.append(ranGroup)
+                continue
+            for lane in ranGroup["lanes"]:
+                outputStacks[lane] = ranGroup["error"]
+
+    return outputStacks
+
+
 def run(bytecode: str, constantPool: str = "", *, format: str = "addressed", outputFile: str = None) -> list:
     """Takes an IJVM bytecode, runs it and returns the stack state.
 
@@ -0,0 +1,126 @@
+import contextlib
+import io
+
+import pytest
+
+pytest.importorskip("numpy")
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from interpreter import batchRun, extractData, run
+
+
+# BIPUSH x, counts down to -1 unless x is negative, then BIPUSH 7
+COUNTDOWN: str = """
+0x40000 0x10 0x05 0x59 0x9b
+0x40004 0x00 0x09 0x10 0x01
+0x40008 0x64 0xa7 0xff 0xf9
+0x4000c 0x10 0x07 0x00 0x00
+"""
+
+# BIPUSH x, calls the same method from two call sites depending on x,
+# the method pushes an LDCW constant and adds its argument to it
+TWO_CALLS: str = """
+0x40000 0x10 0x01 0x99 0x00
+0x40004 0x0d 0x10 0x00 0x10
+0x40008 0x03 0xb6 0x00 0x01
+0x4000c 0xa7 0x00 0x0b 0x10
+0x40010 0x00 0x10 0x04 0xb6
+0x40014 0x00 0x01 0x00 0x10
+0x40018 0x07 0x00 0x00 0x00
+0x4001c 0x00 0x02 0x00 0x01
+0x40020 0x13 0x00 0x02 0x15
+0x40024 0x01 0x60 0xac 0x00
+"""
+
+TWO_CALLS_POOL: str = """
+0x0 0x0
+0x1 0x4001c
+0x2 0x5
+"""
+
+
+# BIPUSH 127, LDCW of a large constant, then doubles it twice
+OVERFLOW: str = "0x40000 0x10 0x7f 0x13 0x00 0x01 0x59 0x60 0x59 0x60"
+
+OVERFLOW_POOL: str = """
+0x0 0x0
+0x1 0x4000000000000000
+"""
+
+
+def patch(text: str, patches: dict) -> str:
+    """Rewrites an addressed code with some of its values replaced, one value per line."""
+
+    data: dict = extractData(text)
+    for addr, value in patches.items():
+        data["data"][addr - data["address"]] = value
+    return "\n".join(f"{hex(data['address'] + i)} {hex(value)}" for i, value in enumerate(data["data"]))
+
+
+def assertSameAsRun(bytecode: str, variants: list, constantPool: str = "") -> list:
+    outputStacks: list = batchRun(bytecode, variants, constantPool)
+    for variant, outputStack in zip(variants, outputStacks):
+        expected: list = run(
+            patch(bytecode, variant.get("bytecode", {})),
+            patch(constantPool, variant.get("constantPool", {})) if constantPool else "",
+        )
+        assert outputStack == expected, variant
+    return outputStacks
+
+
+def test_branch_divergence():
+    values: list = [5, 0, 3, 0xFD, 0x9C, 5, 1, 0x80] * 4
+    outputStacks = assertSameAsRun(COUNTDOWN, [{"bytecode": {0x40001: x}} for x in values])
+    assert outputStacks[:5] == [[0, -1, 7], [0, -1, 7], [0, -1, 7], [0, -3, 7], [0, -100, 7]]
+
+
+def test_frame_divergence():
+    # 0x2000000 looks like a frame marker to ILOAD, and each call site has its own IRETURN address
+    variants: list = [
+        {"bytecode": {0x40001: x}, "constantPool": {0x2: constant}}
+        for x in (0, 1) for constant in (5, 0x2_000_000, 5)
+    ]
+    assertSameAsRun(TWO_CALLS, variants, TWO_CALLS_POOL)
+
+
+def test_constant_pool_variants():
+    variants: list = [{"constantPool": {0x2: constant}} for constant in (0xFF, 0x80, 0x7F, 0x5)]
+    outputStacks = assertSameAsRun(TWO_CALLS, variants, TWO_CALLS_POOL)
+    assert [outputStack[1] for outputStack in outputStacks] == [2, -125, 130, 8]
+
+
+@pytest.mark.parametrize("variant", [
+    {"bytecode": {0x3FFFF: 0}},
+    {"bytecode": {0x40010: 0}},
+    {"constantPool": {0x3: 0}},
+])
+def test_patch_out_of_range(variant):
+    with pytest.raises(ValueError):
+        batchRun(COUNTDOWN, [variant], "0x0 0x0\n0x1 0x0\n0x2 0x0")
+
+
+def test_single_lane_same_as_group():
+    for bytecode, variant, constantPool in [
+        (COUNTDOWN, {"bytecode": {0x40001: 0x03}}, ""),
+        (TWO_CALLS, {"bytecode": {0x40001: 0x00}, "constantPool": {0x2: 0x2_000_000}}, TWO_CALLS_POOL),
+        (OVERFLOW, {}, OVERFLOW_POOL),
+    ]:
+        assert batchRun(bytecode, [variant], constantPool) == batchRun(bytecode, [variant] * 2, constantPool)[:1]
+
+
+def test_overflow_wraps():
+    assert batchRun(OVERFLOW, [{}], OVERFLOW_POOL) == [[0, 127, 0]]
+    assert batchRun(OVERFLOW, [{}] * 2, OVERFLOW_POOL) == [[0, 127, 0]] * 2
+
+
+def test_lane_errors():
+    # LDCW of an index outside of the constant pool
+    bad: dict = {"bytecode": {0x40004: 0x09}}
+    outputStacks: list = batchRun(OVERFLOW, [{}, bad, bad, {}, bad], OVERFLOW_POOL)
+    assert outputStacks[0] == outputStacks[3] == [0, 127, 0]
+    assert all(isinstance(outputStacks[lane], IndexError) for lane in (1, 2, 4))
+    assert isinstance(batchRun(OVERFLOW, [bad], OVERFLOW_POOL)[0], IndexError)
+
+
+def test_empty_bytecode():
+    assert batchRun("", [{}, {}]) == [run("")] * 2